@@ -11,7 +11,6 @@
 
   Requires:
     pip install boto3
-    pip install decorator
 
   ~~~~~~~~~~~~~~~~~~~~~~~~~~
   AWS-S3 NOTES:
@@ -61,23 +60,128 @@
 #------------------------------------------------------------------------------
 import os
 import sys
-import uuid
+import time
+import base64
+import secrets
+import threading
 import boto3
-from decorator import decorator
+from functools import cached_property, wraps
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from boto3.s3.transfer import TransferConfig
 from botocore.client import ClientError
+from botocore.config import Config
 
 DEBUG = 2
 
+## Max number of buckets deleted concurrently by delete_all()
+DELETE_WORKERS = 16
+
+## Default lifetime (seconds) of presigned upload/download URLs
+PRESIGNED_URL_EXPIRES = 3600
+
+## Number of get_object_acl() requests in flight in get_acls_bulk()
+ACL_WORKERS = 32
+
+## ACL grantee URI for "everyone" - grants to this group make a file public
+ALL_USERS_URI = 'http://acs.amazonaws.com/groups/global/AllUsers'
+
+## Number of delete_objects() batches (of up to 1000 keys each) in flight in empty_bucket(),
+## and the max number of listed batches allowed to wait for a worker
+EMPTY_WORKERS = 8
+EMPTY_MAX_PENDING = 2*EMPTY_WORKERS
+
+## Seconds a bucket_exists() result is reused before asking S3 again
+BUCKET_EXISTS_TTL = 60
+
+## Server-side copy settings for copy_file(). CopyObject is limited to 5GB objects;
+## anything larger is copied in COPY_PART_SIZE ranges with UploadPartCopy.
+COPY_OBJECT_MAX_SIZE = 5*1024*1024*1024
+COPY_PART_SIZE = 64*1024*1024
+COPY_MAX_PARTS = 10000
+COPY_WORKERS = 16
+
+## head_object() fields carried over to a multipart copy, matching what CopyObject
+## keeps with its default MetadataDirective=COPY
+COPY_METADATA_FIELDS = ('ContentType', 'ContentEncoding', 'ContentDisposition', 'ContentLanguage',
+                        'CacheControl', 'Expires', 'WebsiteRedirectLocation', 'Metadata')
+
+## Max number of requests that can be in flight at once on the shared S3 client. The
+## worst case is delete_all(): each of its DELETE_WORKERS threads lists one bucket while
+## its own EMPTY_WORKERS threads run delete_objects() batches.
+MAX_POOL_CONNECTIONS = max(DELETE_WORKERS*EMPTY_WORKERS + DELETE_WORKERS, ACL_WORKERS, COPY_WORKERS)
+
+## Connection-pool and retry settings shared by all clients/resources. The pool is sized
+## to MAX_POOL_CONNECTIONS (the boto3 default is 10) so that no concurrent request has to
+## open a connection that is then discarded, and "adaptive" retries back-off client-side,
+## across all threads, when S3 starts throttling (SlowDown/503) under concurrent load.
+## TCP keep-alive lets pooled connections be reused rather than re-established, and
+## virtual-hosted addressing (bucket.s3.amazonaws.com) avoids redirects for buckets
+## outside the default region. SigV4 is forced so that presigned URLs are not signed
+## with the deprecated SigV2, which newer buckets reject.
+BOTO_CONFIG = Config(max_pool_connections=MAX_POOL_CONNECTIONS,
+                     retries={ 'max_attempts': 10, 'mode': 'adaptive' },
+                     tcp_keepalive=True,
+                     signature_version='s3v4',
+                     s3={ 'addressing_style': 'virtual' })
+
+## Process-wide caches so boto3 objects are built once rather than once per AWSResource
+## instance (building a client loads and compiles the service model). Low-level clients
+## are thread-safe and shared by all threads, keyed by (service, region, profile).
+## Sessions and resources are NOT thread-safe, so each thread caches its own.
+_client_cache = {}
+_client_cache_lock = threading.Lock()
+_thread_cache = threading.local()
+
+#------------------------------------------------------------------------------
+def _get_session(region=None, profile=None):
+    """ Return the calling thread's boto3 Session for (region, profile) """
+    if not hasattr(_thread_cache, 'sessions'):
+        _thread_cache.sessions = {}
+    key = (region, profile)
+    session = _thread_cache.sessions.get(key)
+    if session is None:
+        session = boto3.session.Session(region_name=region, profile_name=profile)
+        _thread_cache.sessions[key] = session
+    return session
+
+def _get_client(service, region=None, profile=None):
+    """ Return the process-wide (thread-safe) boto3 client for (service, region, profile) """
+    key = (service, region, profile)
+    client = _client_cache.get(key)
+    if client is None:
+        with _client_cache_lock:
+            client = _client_cache.get(key)
+            if client is None:
+                client = _get_session(region, profile).client(service, config=BOTO_CONFIG)
+                _client_cache[key] = client
+    return client
+
+def _get_resource(service, region=None, profile=None):
+    """ Return the calling thread's boto3 resource for (service, region, profile) """
+    if not hasattr(_thread_cache, 'resources'):
+        _thread_cache.resources = {}
+    key = (service, region, profile)
+    resource = _thread_cache.resources.get(key)
+    if resource is None:
+        resource = _get_session(region, profile).resource(service, config=BOTO_CONFIG)
+        _thread_cache.resources[key] = resource
+    return resource
+
 #------------------------------------------------------------------------------
 class MethodDecorators(object):
-  @decorator
-  def check_bucket_exists(func, self, bucket_name, *args, **kwargs):
+  def check_bucket_exists(func):
       """ Ensure the bucketname exists before peforming bucket operations"""
-      if not self.bucket_exists(bucket_name):
-          print("%s: Bucket (%s) does NOT exist or is inaccessible" % (self.cname, bucket_name))
-          return None
-      else:
-          return func(self, bucket_name, *args, **kwargs)
+      @wraps(func)
+      def wrapper(self, bucket_name, *args, **kwargs):
+          if not self.bucket_exists(bucket_name):
+              print("%s: Bucket (%s) does NOT exist or is inaccessible" % (self.cname, bucket_name))
+              return None
+          try:
+              return func(self, bucket_name, *args, **kwargs)
+          except ClientError as e:
+              self.invalidate_on_no_such_bucket(e, bucket_name)
+              raise
+      return wrapper
 
 #------------------------------------------------------------------------------
 class AWSResource():
@@ -88,16 +192,57 @@ class AWSResource():
         self.cname = self.__class__.__name__
         self.credentials = {}  # placeholder for managing credentials
 
-        self.session = boto3.session.Session()
-        self.region = self.session.region_name
-
-        self.client = boto3.client('s3')
-        self.resource = boto3.resource('s3')
-
         self.debug = DEBUG
+        self.region_name = None   # None: use boto3's default region resolution
+        self.profile = None       # None: use boto3's default credentials chain
         if d_init_args:
             self.debug = d_init_args.get('debug', DEBUG)
+            self.region_name = d_init_args.get('region', None)
+            self.profile = d_init_args.get('profile', None)
+
+
+    ## boto3 objects are built lazily on first access and shared through the module-level
+    ## caches, so constructing additional AWSResource instances is cheap. Only the
+    ## (thread-safe) client is pinned to the instance; session and resource are looked up
+    ## on every access so that each thread gets its own.
+    @property
+    def session(self):
+        return _get_session(self.region_name, self.profile)
+
+    @cached_property
+    def region(self):
+        return self.session.region_name
 
+    @cached_property
+    def client(self):
+        return _get_client('s3', self.region_name, self.profile)
+
+    @property
+    def resource(self):
+        return _get_resource('s3', self.region_name, self.profile)
+
+    def iter_all_names(self):
+        """ Generator yielding all bucket names """
+        try:
+            yield from (bucket.name for bucket in self.resource.buckets.all())
+        except Exception as e:
+            # placeholder to do something
+            print("%s: Failed to retrieve bucket names: %s" % (self.cname, e))
+            raise
+
+    def iter_keys(self, bucket_name, page_size=1000):
+        """ Generator yielding the name of every file (object) in a bucket, one
+        list_objects_v2 page at a time, so memory use is bounded by page_size.
+         Args:
+          * (str) bucket-name
+          * (int) OPTIONAL number of keys requested per page (max 1000)
+         Yields: (str) file-name
+        """
+        paginator = self.client.get_paginator('list_objects_v2')
+        pages = paginator.paginate(Bucket=bucket_name, PaginationConfig={ 'PageSize': page_size })
+        for page in pages:
+            for obj in page.get('Contents', []):
+                yield obj['Key']
 
     def gen_uniq_name(self, prefix, char_limit=32):
         """ Generate a name by concatenating passed prefix with semi-random suffix. 
@@ -110,13 +255,17 @@ class AWSResource():
         """
         if char_limit < 2:
             char_limit = 32
-        random_suffix = uuid.uuid4().hex[:char_limit]
+        ## base32 (lowercased) keeps the suffix DNS-compliant: a-z and 2-7 only.
+        ## 20 random bytes encode to exactly 32 characters (no '=' padding).
+        random_suffix = base64.b32encode(secrets.token_bytes(20)).decode('ascii').lower()[:char_limit]
         name = prefix.lower() + random_suffix
         return name
 
-    def dprint(self, level, msg):
-        """Internal debug message printing"""
+    def dprint(self, level, fmt, *args):
+        """Internal debug message printing. Like the logging module, formatting of
+        fmt with args is deferred until the message is known to be printed."""
         if level <= self.debug:
+            msg = fmt % args if args else fmt
             print("%s: (%d) %s" % (self.cname, level, msg))
 
 
@@ -124,6 +273,14 @@ class AWSResource():
 class S3Bucket(AWSResource):
     """S3 Bucket class"""
 
+    ## Multipart transfer settings for push_file()/pull_file(). Files above 64MB are
+    ## split into 16MB parts with up to 20 parts in flight (boto3 defaults: 8MB/8MB/10).
+    _transfer_config = TransferConfig(multipart_threshold=64*1024*1024,
+                                      multipart_chunksize=16*1024*1024,
+                                      max_concurrency=20,
+                                      max_io_queue=1000,
+                                      use_threads=True)
+
     def __init__(self, d_init_args=None):
 
         super().__init__(d_init_args)
@@ -131,29 +288,72 @@ class S3Bucket(AWSResource):
         self.cname = self.__class__.__name__
         self.bucket_list = []
 
+        ## bucket-name => (exists, time-checked) to avoid a head_bucket call per operation
+        self._bucket_existence_cache = {}
+
 
     def bucket_exists(self, bucket_name):
-        """ Quick/cheap way to identify if a bucket exists """
+        """ Quick/cheap way to identify if a bucket exists. Results are cached for
+         BUCKET_EXISTS_TTL seconds.
+        """
+        cached = self._bucket_existence_cache.get(bucket_name)
+        if cached and time.monotonic() - cached[1] < BUCKET_EXISTS_TTL:
+            return cached[0]
+
         try:
             self.client.head_bucket(Bucket=bucket_name)
-            return True
+            exists = True
         except ClientError:
             # The bucket does not exist or you have no access.
-            return False
+            exists = False
+
+        self._bucket_existence_cache[bucket_name] = (exists, time.monotonic())
+        return exists
+
+
+    def invalidate_bucket_exists(self, bucket_name):
+        """ Drop the cached bucket_exists() result for a bucket """
+        self._bucket_existence_cache.pop(bucket_name, None)
+
+
+    def invalidate_on_no_such_bucket(self, error, *bucket_names):
+        """ Drop the cached bucket_exists() results for the passed buckets if a ClientError
+         says a bucket was removed since its existence was cached. Only 'NoSuchBucket' is
+         checked: a bare '404' from HEAD/GET object calls means a missing key, not bucket.
+        """
+        if error.response.get('Error', {}).get('Code') == 'NoSuchBucket':
+            for bucket_name in bucket_names:
+                self.invalidate_bucket_exists(bucket_name)
 
 
     def get_all_names(self):
         """ Rerieve a list of all bucket names """
-        names = [ bucket.name for bucket in self.resource.buckets.all() ]
+        names = list(self.iter_all_names())
         return names
 
 
     def list_all(self):
         """ Output list of all bucket names """
-        for i,name in enumerate(self.get_all_names(), start=1):
+        for i,name in enumerate(self.iter_all_names(), start=1):
             print( "%d) %s" % (i, name) )
 
 
+    def iter_common_prefixes(self, bucket_name, delim="/", page_size=1000):
+        """ Generator yielding the common bucket-name prefixes one page at a time,
+         using the list_objects_v2 (continuation-token) paginator.
+        Args:
+          * (str) bucket-name
+          * (str) OPTIONAL delimter string
+          * (int) OPTIONAL number of keys requested per page (max 1000)
+        Yields: (dict) CommonPrefixes entry, e.g. {'Prefix': 'logs/'}
+        """
+        paginator = self.client.get_paginator('list_objects_v2')
+        pages = paginator.paginate(Bucket=bucket_name, Delimiter=delim,
+                                   PaginationConfig={ 'PageSize': page_size })
+        for page in pages:
+            yield from page.get('CommonPrefixes', [])
+
+
     def list_common_prefixes(self, bucket_name, delim="/"):
         """ List all common bucket-name prfixes. This is important method as
          S3 uses the file prefix to map it onto a partition. Performance issues can
@@ -163,9 +363,7 @@ class S3Bucket(AWSResource):
           * (str) bucket-name
           * (str) OPTIONAL delimter string
         """
-        paginator = self.client.get_paginator('list_objects')
-        result = paginator.paginate(Bucket=bucket_name, Delimiter=delim)
-        for prefix in result.search('CommonPrefixes'):
+        for prefix in self.iter_common_prefixes(bucket_name, delim):
             print(prefix.get('Prefix'))
 
 
@@ -181,12 +379,13 @@ class S3Bucket(AWSResource):
             region = self.region
 
         bucket_name = self.gen_uniq_name(bucket_name_prefix)
-        self.dprint(1, "Creating new bucket (%s)" % (bucket_name))
+        self.dprint(1, "Creating new bucket (%s)", bucket_name)
 
         bucket = None
         try:
             bucket = self.resource.create_bucket(Bucket=bucket_name,
                           CreateBucketConfiguration={ 'LocationConstraint': region })
+            self._bucket_existence_cache[bucket_name] = (True, time.monotonic())
         except Exception as e:
             # placeholder to do something
             raise
@@ -194,53 +393,96 @@ class S3Bucket(AWSResource):
         return bucket
 
 
-    @MethodDecorators.check_bucket_exists
-    def empty_bucket(self, bucket_name):
-        """ Empty a bucket - removing all objects.
+    def _drain_and_delete(self, bucket_name, delete_bucket=False):
+        """ Remove all objects from a bucket and, optionally, the bucket itself, in a
+        single listing pass. Keys are listed a page (1000 keys) at a time and each page
+        is removed with one delete_objects() request as soon as it is listed, with up
+        to EMPTY_WORKERS pages being deleted concurrently. Listing pauses while
+        EMPTY_MAX_PENDING batches are outstanding, so memory use does not grow with
+        the size of the bucket. Once the listing is exhausted and all batches are done
+        the (now empty) bucket is deleted without re-listing.
         Args:
          * (str) bucket name
-        Retuns: (dict) operation results
+         * (bool) OPTIONAL also delete the bucket
+        Retuns: (tuple) ({'Deleted': (int) count, 'Errors': (list) errors}, delete_bucket() response)
         """
-        resp = None
-        self.dprint(1, "Emptying bucket (%s)" % (bucket_name))
-        bucket = self.resource.Bucket(bucket_name)
+        resp_empty = { 'Deleted': 0, 'Errors': [] }
+        resp_delete = None
+        paginator = self.client.get_paginator('list_objects_v2')
         try:
-            resp = bucket.objects.delete()
+            with ThreadPoolExecutor(max_workers=EMPTY_WORKERS) as executor:
+                futures = {}
+                for page in paginator.paginate(Bucket=bucket_name, PaginationConfig={ 'PageSize': 1000 }):
+                    objects = [ { 'Key': obj['Key'] } for obj in page.get('Contents', []) ]
+                    if objects:
+                        ## Listing outpaces deletion, so hold back until a batch finishes
+                        ## rather than queueing the keys of the whole bucket in memory
+                        if len(futures) >= EMPTY_MAX_PENDING:
+                            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                            self._tally_deleted(resp_empty, done, futures)
+                        future = executor.submit(self.client.delete_objects, Bucket=bucket_name,
+                                                 Delete={ 'Objects': objects, 'Quiet': True })
+                        futures[future] = len(objects)
+                self._tally_deleted(resp_empty, list(as_completed(futures)), futures)
+
+            self.dprint(1, "RESP-empty_bucket(): %s", resp_empty)
+
+            if delete_bucket:
+                self.dprint(1, "Deleting bucket (%s)", bucket_name)
+                try:
+                    resp_delete = self.client.delete_bucket(Bucket=bucket_name)
+                finally:
+                    self.invalidate_bucket_exists(bucket_name)
         except Exception as e:
             # placeholder to do something
             raise
 
-        self.dprint(1, "RESP-empty_bucket(): %s" % resp)
+        return resp_empty, resp_delete
+
+
+    def _tally_deleted(self, resp_empty, done, futures):
+        """ Add the results of finished delete_objects() futures to resp_empty and
+        remove them from the pending futures dict (future => number of keys)
+        """
+        for future in done:
+            ## Quiet mode only reports the keys that failed
+            errors = future.result().get('Errors', [])
+            resp_empty['Deleted'] += futures.pop(future) - len(errors)
+            resp_empty['Errors'].extend(errors)
+
+
+    @MethodDecorators.check_bucket_exists
+    def empty_bucket(self, bucket_name):
+        """ Empty a bucket - removing all objects. See _drain_and_delete().
+        Args:
+         * (str) bucket name
+        Retuns: (dict) operation results {'Deleted': (int) count, 'Errors': (list) errors}
+        """
+        self.dprint(1, "Emptying bucket (%s)", bucket_name)
+        resp, _ = self._drain_and_delete(bucket_name)
         return resp
 
 
     @MethodDecorators.check_bucket_exists
     def delete_bucket(self, bucket_name):
-        """ Delete a bucket after removing all objects.
+        """ Delete a bucket after removing all objects. See _drain_and_delete().
         Args:
          * (str) bucket name
         Retuns: (dict) operation results
         """
+        self.dprint(1, "Emptying and deleting bucket (%s)", bucket_name)
+        _, resp = self._drain_and_delete(bucket_name, delete_bucket=True)
 
-        ## First we empty the bucket
-        resp_empty = self.empty_bucket(bucket_name)
-
-        self.dprint(1, "Deleting bucket (%s)" % (bucket_name))
-        resp = None
-        bucket = self.resource.Bucket(bucket_name)
-        try:
-            resp = bucket.delete()
-        except Exception as e:
-            # placeholder to do something
-            raise
-
-        self.dprint(1, "RESP-delete_bucket(): %s" % resp)
+        self.dprint(1, "RESP-delete_bucket(): %s", resp)
         return resp
 
 
     def delete_all(self, verify=1):
         """ Delete all buckets after removing all objects. BE CAREFUL WITH THIS!!!
          Default access to this method involves user-verification.
+         Buckets are deleted concurrently (up to DELETE_WORKERS at a time) since each
+         delete is dominated by waiting on S3 responses.
+         Retuns: (list) delete_bucket() results, one per bucket
         """
         resp = None
         bnames = self.get_all_names()
@@ -250,11 +492,13 @@ class S3Bucket(AWSResource):
             if verify:
                 ans = input("Are you sure you want to remove all %d buckets?: [y|n] " % N)
             if ans.strip().lower() == 'y':
-                for name in bnames:
-                    resp = self.delete_bucket(name)
+                with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+                    resp = list(executor.map(self.delete_bucket, bnames))
         else:
             print("%s: Zero buckets found" % (self.cname))
 
+        return resp
+
 
     @MethodDecorators.check_bucket_exists
     def push_file(self, bucket_name, filename, **kwargs):
@@ -275,15 +519,16 @@ class S3Bucket(AWSResource):
 
         """
         resp = None
-        self.dprint(1, "Pushing file (%s) to bucket (%s). Extra=(%s)" % (filename, bucket_name, str(kwargs)))
+        self.dprint(1, "Pushing file (%s) to bucket (%s). Extra=(%s)", filename, bucket_name, kwargs)
         d_extra = kwargs
         try:
-            resp = self.resource.Object(bucket_name, filename).upload_file( Filename=filename, ExtraArgs=d_extra)
+            resp = self.resource.Object(bucket_name, filename).upload_file( Filename=filename, ExtraArgs=d_extra,
+                                                                          Config=self._transfer_config )
         except Exception as e:
             # placeholder to do something
             raise
 
-        self.dprint(1, "RESP-upload_file(): %s" % resp)
+        self.dprint(1, "RESP-upload_file(): %s", resp)
         return resp
 
 
@@ -297,20 +542,118 @@ class S3Bucket(AWSResource):
          Return: (obj) response
         """
         resp = None
-        self.dprint(1, "Downloading file (%s) from bucket (%s) to localhost:%s" % (filename, bucket_name, local_dest_path))
+        self.dprint(1, "Downloading file (%s) from bucket (%s) to localhost:%s", filename, bucket_name, local_dest_path)
         try:
-            resp = self.resource.Object(bucket_name, filename).download_file( Filename=local_dest_path )
+            resp = self.resource.Object(bucket_name, filename).download_file( Filename=local_dest_path,
+                                                                            Config=self._transfer_config )
         except Exception as e:
             # placeholder to do something
             raise
 
-        self.dprint(1, "RESP-download_file(): %s" % resp)
+        self.dprint(1, "RESP-download_file(): %s", resp)
         if not os.path.exists(local_dest_path):
             print("ERROR - File download failed - local file not found: %s" % (dest_path))
             
         return resp
 
 
+    @MethodDecorators.check_bucket_exists
+    def select_from_file(self, bucket_name, filename, sql, input_serialization=None, output_serialization=None):
+        """ Run an S3 Select SQL query against a (CSV/JSON/Parquet) file, so that only
+         the matching rows are transferred rather than the whole file (see pull_file()).
+         Args:
+          * (str) bucket-name
+          * (str) file-name to query
+          * (str) SQL expression, e.g. "SELECT * FROM s3object s WHERE s.status = 'ERROR'"
+          * (dict) OPTIONAL InputSerialization (default=CSV with header row, uncompressed)
+          * (dict) OPTIONAL OutputSerialization (default=CSV)
+         Return: (generator) of (bytes) record chunks, as they arrive
+
+         NOTE: The query is issued immediately; results are streamed as the returned
+          generator is consumed.
+        """
+        if input_serialization is None:
+            input_serialization = { 'CSV': { 'FileHeaderInfo': 'USE' }, 'CompressionType': 'NONE' }
+        if output_serialization is None:
+            output_serialization = { 'CSV': {} }
+
+        self.dprint(1, "Selecting from file (%s) in bucket (%s): %s", filename, bucket_name, sql)
+        try:
+            resp = self.client.select_object_content(Bucket=bucket_name, Key=filename,
+                                                     Expression=sql, ExpressionType='SQL',
+                                                     InputSerialization=input_serialization,
+                                                     OutputSerialization=output_serialization)
+        except Exception as e:
+            # placeholder to do something
+            raise
+
+        return self._iter_select_records(resp['Payload'])
+
+
+    def _iter_select_records(self, event_stream):
+        """ Generator yielding the record payloads from a select_object_content() event-stream """
+        for event in event_stream:
+            if 'Records' in event:
+                yield event['Records']['Payload']
+            elif 'Stats' in event:
+                self.dprint(2, "Select stats: %s", event['Stats']['Details'])
+
+
+    def generate_upload_url(self, bucket_name, filename, expires=PRESIGNED_URL_EXPIRES):
+        """ Generate a presigned URL allowing an HTTP PUT of a file to a bucket without
+         AWS credentials. The transfer itself can then be done by any HTTP client
+         (curl, aiohttp, etc) rather than streaming the bytes through boto3.
+         Presigning is done locally - the bucket is not checked for existence.
+         Args:
+          * (str) bucket-name
+          * (str) file-name to upload
+          * (int) OPTIONAL URL lifetime in seconds
+         Return: (str) presigned URL
+        """
+        self.dprint(1, "Generating upload URL for file (%s) in bucket (%s)", filename, bucket_name)
+        url = self.client.generate_presigned_url('put_object',
+                                                 Params={ 'Bucket': bucket_name, 'Key': filename },
+                                                 ExpiresIn=expires)
+        return url
+
+
+    def generate_download_url(self, bucket_name, filename, expires=PRESIGNED_URL_EXPIRES):
+        """ Generate a presigned URL allowing an HTTP GET of a file from a bucket
+         without AWS credentials. Presigning is done locally - the bucket is not
+         checked for existence.
+         Args:
+          * (str) bucket-name
+          * (str) file-name to download
+          * (int) OPTIONAL URL lifetime in seconds
+         Return: (str) presigned URL
+        """
+        self.dprint(1, "Generating download URL for file (%s) in bucket (%s)", filename, bucket_name)
+        url = self.client.generate_presigned_url('get_object',
+                                                 Params={ 'Bucket': bucket_name, 'Key': filename },
+                                                 ExpiresIn=expires)
+        return url
+
+
+    def create_upload_session(self, bucket_name, filenames, expires=PRESIGNED_URL_EXPIRES):
+        """ Generate presigned upload URLs for a set of files, so that callers can
+         upload them in parallel with an external HTTP client (e.g. curl --parallel).
+         Presigning is done locally - no requests are made to S3, so the bucket is not
+         checked for existence.
+         Args:
+          * (str) bucket-name
+          * (list) file-names to upload
+          * (int) OPTIONAL URL lifetime in seconds
+         Return: (dict) {file-name: presigned URL}
+        """
+        self.dprint(1, "Creating upload session for %d files in bucket (%s)", len(filenames), bucket_name)
+        d_urls = {}
+        for filename in filenames:
+            d_urls[filename] = self.client.generate_presigned_url('put_object',
+                                                                  Params={ 'Bucket': bucket_name, 'Key': filename },
+                                                                  ExpiresIn=expires)
+        return d_urls
+
+
     def copy_file(self, bucket_name_source, bucket_name_dest, filename):
         """ Copy file from one bucket to another
          Args:
@@ -321,21 +664,72 @@ class S3Bucket(AWSResource):
         """
         resp = None
         if not self.bucket_exists(bucket_name_source):
-            print("%s: Source bucket (%s) does not exist or is inaccessible" % (self.cname, bucket_name_souce))
+            print("%s: Source bucket (%s) does not exist or is inaccessible" % (self.cname, bucket_name_source))
             return None
         if not self.bucket_exists(bucket_name_dest):
             print("%s: Destination bucket (%s) does not exist or is inaccessible" % (self.cname, bucket_name_dest))
             return None
 
         copy_source = { 'Bucket': bucket_name_source, 'Key': filename }
-        self.dprint(1, "Copying file (%s) from bucket (%s) to bucket (%s)" % (filename, bucket_name_source, bucket_name_dest))
+        self.dprint(1, "Copying file (%s) from bucket (%s) to bucket (%s)", filename, bucket_name_source, bucket_name_dest)
         try:
-            resp = self.resource.Object(bucket_name_dest, filename).copy(copy_source)
+            head = self.client.head_object(Bucket=bucket_name_source, Key=filename)
+            size = head['ContentLength']
+            if size < COPY_OBJECT_MAX_SIZE:
+                resp = self.client.copy_object(Bucket=bucket_name_dest, Key=filename, CopySource=copy_source)
+            else:
+                resp = self._multipart_copy(copy_source, bucket_name_dest, filename, head)
+        except ClientError as e:
+            self.invalidate_on_no_such_bucket(e, bucket_name_source, bucket_name_dest)
+            raise
         except Exception as e:
             # placeholder to do something
             raise
 
-        self.dprint(1, "RESP-copy_file(): %s" % resp)
+        self.dprint(1, "RESP-copy_file(): %s", resp)
+        return resp
+
+
+    def _multipart_copy(self, copy_source, bucket_name_dest, filename, head):
+        """ Server-side copy of an object too large for CopyObject, copying byte-ranges
+         of the source concurrently with UploadPartCopy. The source content headers and
+         user metadata (COPY_METADATA_FIELDS) are applied to the new object, as CopyObject
+         would. The upload is aborted if any part or the completion fails so no orphaned
+         parts are left (and billed) in the destination.
+         Args:
+          * (dict) copy-source {'Bucket': ..., 'Key': ...}
+          * (str) destination bucket-name
+          * (str) destination file-name
+          * (dict) source head_object() response
+         Return: (dict) complete_multipart_upload() response
+        """
+        size = head['ContentLength']
+        part_size = max(COPY_PART_SIZE, -(-size // COPY_MAX_PARTS))
+        ranges = [ (part_num, start, min(start + part_size, size) - 1)
+                   for part_num, start in enumerate(range(0, size, part_size), start=1) ]
+        self.dprint(2, "Multipart copy of (%s): %d parts of %d bytes", filename, len(ranges), part_size)
+
+        d_metadata = { field: head[field] for field in COPY_METADATA_FIELDS if field in head }
+        mpu = self.client.create_multipart_upload(Bucket=bucket_name_dest, Key=filename, **d_metadata)
+        upload_id = mpu['UploadId']
+        try:
+            with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+                futures = [ executor.submit(self.client.upload_part_copy,
+                                            Bucket=bucket_name_dest, Key=filename,
+                                            UploadId=upload_id, PartNumber=part_num,
+                                            CopySource=copy_source,
+                                            CopySourceRange="bytes=%d-%d" % (first, last))
+                            for part_num, first, last in ranges ]
+                parts = [ { 'PartNumber': part_num, 'ETag': future.result()['CopyPartResult']['ETag'] }
+                          for (part_num, _, _), future in zip(ranges, futures) ]
+
+            resp = self.client.complete_multipart_upload(Bucket=bucket_name_dest, Key=filename,
+                                                         UploadId=upload_id,
+                                                         MultipartUpload={ 'Parts': parts })
+        except Exception as e:
+            self.client.abort_multipart_upload(Bucket=bucket_name_dest, Key=filename, UploadId=upload_id)
+            raise
+
         return resp
 
 
@@ -348,14 +742,14 @@ class S3Bucket(AWSResource):
          Return: (obj) response
         """
         resp = None
-        self.dprint(1, "Removing file (%s) from bucket (%s)" % (filename, bucket_name))
+        self.dprint(1, "Removing file (%s) from bucket (%s)", filename, bucket_name)
         try:
             resp = self.resource.Object(bucket_name, filename).delete()
         except Exception as e:
             # placeholder to do something
             raise
 
-        self.dprint(1, "RESP-delete_file(): %s" % resp)
+        self.dprint(1, "RESP-delete_file(): %s", resp)
         return resp
 
 
@@ -385,6 +779,61 @@ class S3Bucket(AWSResource):
         return grants
 
 
+    @MethodDecorators.check_bucket_exists
+    def get_acls_bulk(self, bucket_name, filenames=None):
+        """ Get the ACLs for many files, fetching up to ACL_WORKERS concurrently.
+         Uses the (thread-safe) low-level client rather than the resource.
+         Args:
+          * (str) bucket-name
+          * (list) OPTIONAL file-names to check (default=all files in bucket)
+         Return: (dict) {file-name: get_object_acl() response, or ClientError if that file failed}
+
+         NOTE: A failure on one file (AccessDenied, or NoSuchKey for a file removed since
+          listing) is recorded against that file rather than aborting the whole audit.
+        """
+        if filenames is None:
+            filenames = list(self.iter_keys(bucket_name))
+
+        self.dprint(1, "Getting ACLs for %d files in bucket=(%s)", len(filenames), bucket_name)
+        d_acls = {}
+        with ThreadPoolExecutor(max_workers=ACL_WORKERS) as executor:
+            futures = { executor.submit(self.client.get_object_acl, Bucket=bucket_name, Key=filename): filename
+                        for filename in filenames }
+            for future in as_completed(futures):
+                filename = futures[future]
+                try:
+                    d_acls[filename] = future.result()
+                except ClientError as e:
+                    d_acls[filename] = e
+
+        n_failed = sum(1 for acl in d_acls.values() if isinstance(acl, Exception))
+        if n_failed:
+            print("%s: Failed to get ACLs for %d of %d files in bucket=(%s)" % (self.cname, n_failed, len(filenames), bucket_name))
+
+        return d_acls
+
+
+    @MethodDecorators.check_bucket_exists
+    def get_public_files(self, bucket_name, filenames=None):
+        """ Identify files readable by everyone (granted to the AllUsers group).
+         Files whose ACL could not be retrieved are skipped.
+         Args:
+          * (str) bucket-name
+          * (list) OPTIONAL file-names to check (default=all files in bucket)
+         Return: (list) public file-names
+        """
+        public = []
+        for filename, acl in self.get_acls_bulk(bucket_name, filenames).items():
+            if not isinstance(acl, dict):
+                ## ACL could not be retrieved (see get_acls_bulk())
+                continue
+            for grant in acl.get('Grants', []):
+                if grant['Grantee'].get('URI') == ALL_USERS_URI and grant['Permission'] in ('READ', 'FULL_CONTROL'):
+                    public.append(filename)
+                    break
+        return public
+
+
     @MethodDecorators.check_bucket_exists
     def set_file_acls(self, bucket_name, filename, acl_value):
         """ Set file ACL
@@ -423,10 +872,10 @@ class S3Object(AWSResource):
 
     def list_all(self):
         """ Output list of all bucket names """
-        for i,bucket in enumerate(self.resource.buckets.all(), start=1):
-            print( "%d) %s" % (i, bucket.name) )
-            for j,item in enumerate(bucket.objects.all(), start=1):
-                print("\t(%d) %s" % (j, item.key))
+        for i,bucket_name in enumerate(self.iter_all_names(), start=1):
+            print( "%d) %s" % (i, bucket_name) )
+            for j,key in enumerate(self.iter_keys(bucket_name), start=1):
+                print("\t(%d) %s" % (j, key))
 
 
     def get_parent_bucket(self, object):
@@ -438,8 +887,6 @@ class S3Object(AWSResource):
 #------------------------------------------------------------------------------
 if __name__ == '__main__':
 
-    import time
-
     s3bkt = S3Bucket()
 
     s3bkt.delete_all()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+"""
+
+  File: async_s3_manager.py
+  Description:
+    Exposes an AsyncS3Bucket() class - an asyncio counterpart to S3_manager.S3Bucket()
+    for workloads that issue many independent S3 requests (copying every file from one
+    bucket to another, fetching many small files, etc). With asyncio, hundreds of
+    requests can be in flight from a single thread, rather than one-per-thread as with
+    a ThreadPoolExecutor.  The sync S3Bucket() class remains the general-purpose API.
+
+  Requires:
+    pip install boto3
+    pip install aioboto3
+
+  Usage:
+    An AsyncS3Bucket() holds one open S3 client, so it is used as an async context-manager:
+
+      async with AsyncS3Bucket() as s3bkt:
+          resp = await s3bkt.copy_many(src_bucket, dest_bucket, keys)
+
+"""
+
+#------------------------------------------------------------------------------
+import sys
+import asyncio
+import aioboto3
+from botocore.client import ClientError
+from botocore.config import Config
+
+from S3_manager import DEBUG, BOTO_CONFIG, S3Bucket
+
+## Max number of requests in flight at once from copy_many(). Higher values risk
+## S3 throttling (SlowDown/503) rather than more throughput.
+MAX_CONCURRENCY = 100
+
+## Same retry settings as the sync classes, with a connection-pool large enough
+## for MAX_CONCURRENCY requests
+ASYNC_BOTO_CONFIG = BOTO_CONFIG.merge(Config(max_pool_connections=MAX_CONCURRENCY))
+
+#------------------------------------------------------------------------------
+class AsyncS3Bucket():
+    """Async S3 Bucket class"""
+
+    ## Share the sync class multipart transfer settings
+    _transfer_config = S3Bucket._transfer_config
+
+    def __init__(self, d_init_args=None):
+
+        self.cname = self.__class__.__name__
+
+        self.debug = DEBUG
+        self.region_name = None
+        self.profile = None
+        if d_init_args:
+            self.debug = d_init_args.get('debug', DEBUG)
+            self.region_name = d_init_args.get('region', None)
+            self.profile = d_init_args.get('profile', None)
+
+        self.session = aioboto3.Session(region_name=self.region_name, profile_name=self.profile)
+        self.client = None
+        self._client_ctx = None
+
+
+    async def __aenter__(self):
+        self._client_ctx = self.session.client('s3', config=ASYNC_BOTO_CONFIG)
+        self.client = await self._client_ctx.__aenter__()
+        return self
+
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._client_ctx.__aexit__(exc_type, exc, tb)
+        self.client = None
+        self._client_ctx = None
+
+
+    def dprint(self, level, fmt, *args):
+        """Internal debug message printing. Like the logging module, formatting of
+        fmt with args is deferred until the message is known to be printed."""
+        if level <= self.debug:
+            msg = fmt % args if args else fmt
+            print("%s: (%d) %s" % (self.cname, level, msg))
+
+
+    async def bucket_exists(self, bucket_name):
+        """ Quick/cheap way to identify if a bucket exists """
+        try:
+            await self.client.head_bucket(Bucket=bucket_name)
+            return True
+        except ClientError:
+            # The bucket does not exist or you have no access.
+            return False
+
+
+    async def get_all_names(self):
+        """ Rerieve a list of all bucket names """
+        resp = await self.client.list_buckets()
+        names = [ bucket['Name'] for bucket in resp.get('Buckets', []) ]
+        return names
+
+
+    async def get_all_keys(self, bucket_name):
+        """ Retrieve a list of all file (object) names in a bucket
+         Args:
+          * (str) bucket-name
+         Return: (list) file-names
+        """
+        keys = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        async for page in paginator.paginate(Bucket=bucket_name, PaginationConfig={ 'PageSize': 1000 }):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []))
+        return keys
+
+
+    async def push_file(self, bucket_name, filename, **kwargs):
+        """ Push/upload a (file) object to a specified bucket-name.
+         Args:
+          * (str) bucket-name
+          * (str) file-name to upload
+          * (kwargs) for ExtraArgs. See S3Bucket.push_file()
+         Return: (obj) response
+        """
+        self.dprint(1, "Pushing file (%s) to bucket (%s). Extra=(%s)", filename, bucket_name, kwargs)
+        resp = await self.client.upload_file(filename, bucket_name, filename, ExtraArgs=kwargs,
+                                             Config=self._transfer_config)
+        self.dprint(1, "RESP-upload_file(): %s", resp)
+        return resp
+
+
+    async def pull_file(self, bucket_name, filename, local_dest_path):
+        """ Pull/download a (file) object from a specified bucket-name.
+         Args:
+          * (str) bucket-name
+          * (str) file-name to download
+          * (str) local path to which file is downloaded
+         Return: (obj) response
+        """
+        self.dprint(1, "Downloading file (%s) from bucket (%s) to localhost:%s", filename, bucket_name, local_dest_path)
+        resp = await self.client.download_file(bucket_name, filename, local_dest_path,
+                                               Config=self._transfer_config)
+        self.dprint(1, "RESP-download_file(): %s", resp)
+        return resp
+
+
+    async def copy_file(self, bucket_name_source, bucket_name_dest, filename):
+        """ Server-side copy of a file from one bucket to another. Objects must be
+         under 5GB - use S3Bucket.copy_file() for larger objects.
+         Args:
+          * (str) source bucket-name
+          * (str) destination bucket-name
+          * (str) file-name to copy
+         Return: (obj) response
+        """
+        copy_source = { 'Bucket': bucket_name_source, 'Key': filename }
+        self.dprint(2, "Copying file (%s) from bucket (%s) to bucket (%s)", filename, bucket_name_source, bucket_name_dest)
+        resp = await self.client.copy_object(Bucket=bucket_name_dest, Key=filename, CopySource=copy_source)
+        return resp
+
+
+    async def copy_many(self, bucket_name_source, bucket_name_dest, filenames=None, concurrency=MAX_CONCURRENCY):
+        """ Copy many files from one bucket to another concurrently, with at most
+         'concurrency' copies in flight at once.
+         Args:
+          * (str) source bucket-name
+          * (str) destination bucket-name
+          * (list) OPTIONAL file-names to copy (default=all files in source bucket)
+          * (int) OPTIONAL max number of concurrent copies
+         Return: (dict) {file-name: response or exception}
+        """
+        for bucket_name in (bucket_name_source, bucket_name_dest):
+            if not await self.bucket_exists(bucket_name):
+                print("%s: Bucket (%s) does NOT exist or is inaccessible" % (self.cname, bucket_name))
+                return None
+
+        if filenames is None:
+            filenames = await self.get_all_keys(bucket_name_source)
+
+        self.dprint(1, "Copying %d files from bucket (%s) to bucket (%s)", len(filenames), bucket_name_source, bucket_name_dest)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded_copy(filename):
+            async with semaphore:
+                return await self.copy_file(bucket_name_source, bucket_name_dest, filename)
+
+        results = await asyncio.gather(*(bounded_copy(f) for f in filenames), return_exceptions=True)
+        d_results = dict(zip(filenames, results))
+
+        n_failed = sum(1 for r in results if isinstance(r, Exception))
+        if n_failed:
+            print("%s: %d of %d copies failed" % (self.cname, n_failed, len(filenames)))
+
+        return d_results
+
+
+    async def remove_file(self, bucket_name, filename):
+        """ Remove file from a bucket
+         Args:
+          * (str) bucket-name
+          * (str) file-name to remove
+         Return: (obj) response
+        """
+        self.dprint(1, "Removing file (%s) from bucket (%s)", filename, bucket_name)
+        resp = await self.client.delete_object(Bucket=bucket_name, Key=filename)
+        self.dprint(1, "RESP-delete_file(): %s", resp)
+        return resp
+
+
+#------------------------------------------------------------------------------
+async def main(bucket_name_source, bucket_name_dest):
+    """ Copy every file from one bucket to another """
+    async with AsyncS3Bucket() as s3bkt:
+        d_results = await s3bkt.copy_many(bucket_name_source, bucket_name_dest)
+        if d_results:
+            n_copied = sum(1 for r in d_results.values() if not isinstance(r, Exception))
+            print("Copied %d files" % n_copied)
+
+
+#------------------------------------------------------------------------------
+if __name__ == '__main__':
+
+    if len(sys.argv) != 3:
+        print("Usage: %s <source-bucket> <destination-bucket>" % (sys.argv[0]))
+        sys.exit(1)
+
+    asyncio.run(main(sys.argv[1], sys.argv[2]))
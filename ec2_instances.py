@@ -12,6 +12,7 @@ import os
 import sys
 import argparse
 import boto3
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 myname = os.path.basename(__file__)
 
@@ -49,38 +50,74 @@ all_states = {
 #######################################
 
 ## Add whatver attributes we are interested in
-attributes = ['name', 'type', 'state', 'private_ip', 'public_ip', 'launch_time']
+attributes = ['name', 'region', 'type', 'state', 'private_ip', 'public_ip', 'launch_time']
 
 #-------------------------------------------------------------------------------------------
 def get_instance_data(ec2, state):
     """Retrieve instance data for all instances using optional state Filters. 
-       Default is no state filters.
+       Default is no state filters. All attributes are taken from the paginated
+       describe_instances responses, so no per-instance requests are made.
        Args:
-        * (obj) ec2 boto3.resource
+        * (obj) ec2 boto3.client
         * (str) state 
        Returns: (dict) instance data
     """
+    region = ec2.meta.region_name
     filters = []
     if state:
         state_filter = { 'Name':'instance-state-name', 'Values': [state]}
         filters = [state_filter]
 
-    all_instances = ec2.instances.filter(Filters=filters)
+    paginator = ec2.get_paginator('describe_instances')
 
     instance_data = {}
-    for instance in all_instances:
-        for tag in instance.tags:
-            if 'Name'in tag['Key']:
-                name = tag['Value']
-
-        instance_data[instance.id] = {
-            'name': name,
-            'type': instance.instance_type,
-            'state': instance.state['Name'],
-            'private_ip': instance.private_ip_address,
-            'public_ip': instance.public_ip_address,
-            'launch_time': instance.launch_time
-            }
+    for page in paginator.paginate(Filters=filters):
+        for reservation in page['Reservations']:
+            for instance in reservation['Instances']:
+                inst_get = instance.get
+                data = dict.fromkeys(attributes)
+                data['name'] = next((tag['Value'] for tag in inst_get('Tags') or () if tag['Key'] == 'Name'), None)
+                data['region'] = region
+                data['type'] = instance['InstanceType']
+                data['state'] = instance['State']['Name']
+                data['private_ip'] = inst_get('PrivateIpAddress')
+                data['public_ip'] = inst_get('PublicIpAddress')
+                data['launch_time'] = instance['LaunchTime']
+                instance_data[instance['InstanceId']] = data
+    return instance_data
+
+#-------------------------------------------------------------------------------------------
+def get_region_instance_data(region, state):
+    """Retrieve instance data for a single region. Runs in a worker thread, so it
+       uses its own Session (boto3 Sessions are not thread-safe).
+       Args:
+        * (str) region name
+        * (str) state
+       Returns: (dict) instance data
+    """
+    session = boto3.session.Session(region_name=region)
+    ec2 = session.client('ec2')
+    return get_instance_data(ec2, state)
+
+#-------------------------------------------------------------------------------------------
+def get_all_regions_instance_data(state):
+    """Retrieve instance data for every region enabled for the account, querying
+       all regions concurrently so total time is that of the slowest region.
+       Args:
+        * (str) state
+       Returns: (dict) instance data
+    """
+    regions = [ r['RegionName'] for r in boto3.client('ec2').describe_regions()['Regions'] ]
+
+    instance_data = {}
+    with ThreadPoolExecutor(max_workers=len(regions)) as executor:
+        futures = { executor.submit(get_region_instance_data, region, state): region for region in regions }
+        for future in as_completed(futures):
+            region = futures[future]
+            try:
+                instance_data.update(future.result())
+            except Exception as e:
+                print("%s: Failed to retrieve instances for region (%s): %s" % (myname, region, e))
     return instance_data
 
 #-------------------------------------------------------------------------------------------
@@ -94,6 +131,7 @@ def parse_input_args():
     parser.add_argument('-d','--debug', required=False, metavar='debug', type=int, choices=[0,1,2], help='set debug level')
     parser.add_argument('-v', required=False, action='count', help='set verbosity level')
     parser.add_argument('--state', '-s', action="store", dest="state")
+    parser.add_argument('--all-regions', '-a', action='store_true', dest="all_regions", help='query all regions')
 
     args = parser.parse_args()
 
@@ -120,8 +158,11 @@ if __name__ == '__main__':
             print("%s: State [%s] is not a valid state" % (myname, state))
             sys.exit(1)
 
-    ec2 = boto3.resource('ec2')
-    d_instance_data = get_instance_data(ec2, state)
+    if input_args.all_regions:
+        d_instance_data = get_all_regions_instance_data(state)
+    else:
+        ec2 = boto3.client('ec2')
+        d_instance_data = get_instance_data(ec2, state)
     print("-"*50)
     if state:
         print("STATE=%s" % state)
@@ -24,34 +24,38 @@ myname = os.path.basename(__file__)
 DEBUG = 0
 VERBOSITY = 0
 
+## Instance attributes compiled by get_instance_data()
+attributes = ['name', 'type', 'state', 'private_ip', 'public_ip', 'launch_time']
+
 #-----------------------------------------------------------------------------
-def get_instance_data( ec2, instance_id=None ):
-    """ Retrieve all instances. Compile a dict of instance data
+def get_instance_data( ec2_client, instance_id=None ):
+    """ Retrieve all instances. Compile a dict of instance data from the paginated
+    describe_instances responses (no per-instance requests are made).
     Args:
-     * (obj): ec2.resource
+     * (obj): ec2.client
      * (list): OPTIONAL instance-id to return
     Returns: (dict) instance data
     """
 
-    instances = ec2.instances.all()
+    filters = []
+    if instance_id:
+        filters = [{ 'Name': 'instance-id', 'Values': [instance_id] }]
+
+    paginator = ec2_client.get_paginator('describe_instances')
 
     instance_data = {}
-    for instance in instances:
-        for tag in instance.tags:
-            if 'Name'in tag['Key']:
-                name = tag['Value']
-        id = instance.id
-        if instance_id:
-            if id != instance_id:
-                continue
-        instance_data[instance.id] = {
-            'name': name,
-            'type': instance.instance_type,
-            'state': instance.state['Name'],
-            'private_ip': instance.private_ip_address,
-            'public_ip': instance.public_ip_address,
-            'launch_time': instance.launch_time
-        }
+    for page in paginator.paginate(Filters=filters):
+        for reservation in page['Reservations']:
+            for instance in reservation['Instances']:
+                inst_get = instance.get
+                data = dict.fromkeys(attributes)
+                data['name'] = next((tag['Value'] for tag in inst_get('Tags') or () if tag['Key'] == 'Name'), None)
+                data['type'] = instance['InstanceType']
+                data['state'] = instance['State']['Name']
+                data['private_ip'] = inst_get('PrivateIpAddress')
+                data['public_ip'] = inst_get('PublicIpAddress')
+                data['launch_time'] = instance['LaunchTime']
+                instance_data[instance['InstanceId']] = data
     return instance_data
 
 #-----------------------------------------------------------------------------
@@ -104,7 +108,7 @@ if __name__ == '__main__':
 
     ec2 = boto3.resource('ec2')
 
-    instance_data = get_instance_data(ec2, instance_id)
+    instance_data = get_instance_data(ec2.meta.client, instance_id)
 
     if not len(instance_data.keys()):
         print("No instances matching input ID (%s)" % (instance_id))
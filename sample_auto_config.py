@@ -8,6 +8,8 @@
   Steps:
     1) Get EC2 instance Meta data from the local EC2 instance by making a
        request to: http://169.254.169.254/latest/meta-data/<data-method>
+       Requests use IMDSv2: a session token is first obtained with a PUT to
+       http://169.254.169.254/latest/api/token and sent with every request.
     2) Perform the auto-config setting
 
   Requires: pip install requests
@@ -39,8 +41,38 @@
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 
 meta_data_url = 'http://169.254.169.254/latest/meta-data/'
+token_url = 'http://169.254.169.254/latest/api/token'
+token_ttl_seconds = 21600
+
+## (connect, read) timeouts in seconds
+request_timeout = (0.1, 1.0)
+
+## One persistent session so all metadata requests reuse the same connection
+_session = requests.Session()
+_session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+## IMDSv2 session token - fetched on first get_data() call
+_token = None
+
+#---------------------------------------------------------------
+def get_token():
+    """Retrieve (and cache) the IMDSv2 session token"""
+    global _token
+    if _token is None:
+        try:
+            resp = _session.put(
+                token_url,
+                headers={'X-aws-ec2-metadata-token-ttl-seconds': str(token_ttl_seconds)},
+                timeout=request_timeout)
+            resp.raise_for_status()
+        except requests.exceptions.RequestException:
+            raise
+        _token = resp.text
+
+    return _token
 
 #---------------------------------------------------------------
 def get_data(data_method):
@@ -48,9 +80,10 @@ def get_data(data_method):
     value = None
     request_url = meta_data_url + data_method
     try:
-        value = requests.get(
+        value = _session.get(
             request_url,
-            timeout=0.01).text
+            headers={'X-aws-ec2-metadata-token': get_token()},
+            timeout=request_timeout).text
     except requests.exceptions.RequestException:
         raise
 